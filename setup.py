@@ -9,5 +9,12 @@ setup(
     author_email='zach@sotaog.com',
     license='MIT',
     packages=['sotaog_public_api_client'],
-    install_requires=['requests']
+    python_requires='>=3.8',
+    install_requires=['requests'],
+    extras_require={
+        'async': ['httpx[http2]'],
+        'speedups': ['orjson', 'pysimdjson', 'brotli'],
+        'streaming': ['ijson'],
+        'arrays': ['numpy', 'ijson']
+    }
 )
@@ -1,33 +1,358 @@
+import array
+import base64
 import csv
+import dataclasses
+import datetime
+import enum
+import json
 import logging
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+  import httpx
+except ImportError:
+  httpx = None
+
+# httpx client settings matching requests: no client-side timeout and redirects followed
+_HTTPX_OPTIONS = {'timeout': None, 'follow_redirects': True}
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  import ijson
+  try:
+    ijson = ijson.get_backend('yajl2_c')
+  except ImportError:
+    pass
+except ImportError:
+  ijson = None
+
+try:
+  import simdjson
+except ImportError:
+  simdjson = None
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
 
 logger = logging.getLogger('sotaog_public_api_client')
 logger.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
 
 
 class Client_Exception(Exception):
-  pass
+  def __init__(self, message, response = None):
+    super().__init__(message)
+    self.response = response
+    self._body = None
+
+  @property
+  def body(self):
+    # Only decoded when asked for, so raising on an error response never parses it
+    if self._body is None and self.response is not None:
+      try:
+        self._body = _json(self.response)
+      except ValueError:
+        self._body = self.response.text
+    return self._body
+
+
+class Bulk_Exception(Client_Exception):
+  # Bulk helpers attempt every asset before raising: errors maps each failed asset id to its exception,
+  # results maps each asset id that went through to its return value and succeeded lists those ids
+  def __init__(self, message, errors, results):
+    super().__init__(message)
+    self.errors = errors
+    self.results = results
+    self.succeeded = list(results)
+
+
+def _bulk_results(action, outcomes):
+  # outcomes holds (asset_id, result, exception or None) for every asset in a bulk call
+  errors = dict((asset_id, error) for asset_id, _, error in outcomes if error is not None)
+  results = dict((asset_id, result) for asset_id, result, error in outcomes if error is None)
+  if errors:
+    raise Bulk_Exception('Unable to {} for {} of {} assets'.format(action, len(errors), len(outcomes)), errors, results)
+  return results
+
+
+def _json(response):
+  # orjson parses the raw bytes directly, skipping the text decode done by response.json()
+  if orjson is not None:
+    return orjson.loads(response.content)
+  return response.json()
+
+
+def _loads(content):
+  if orjson is not None:
+    return orjson.loads(content)
+  return json.loads(content.decode('utf-8'))
+
+
+def _params(**params):
+  # Unset (falsy) arguments are left out of the query string/body
+  return {key: value for key, value in params.items() if value}
+
+
+_DEFAULT_DATAPOINTS_BODY = {'sort': 'desc', 'limit': 100}
+
+
+def _datapoints_body(asset_datatypes, start_ts, end_ts, sort, limit):
+  if sort == _DEFAULT_DATAPOINTS_BODY['sort'] and limit == _DEFAULT_DATAPOINTS_BODY['limit']:
+    # Common case: copy the prebuilt defaults rather than testing each key
+    body = dict(_DEFAULT_DATAPOINTS_BODY, asset_datatypes=asset_datatypes)
+  else:
+    body = dict(_params(sort=sort, limit=limit), asset_datatypes=asset_datatypes)
+  if start_ts:
+    body['start_ts'] = start_ts
+  if end_ts:
+    body['end_ts'] = end_ts
+  return body
+
+
+def _finite(value):
+  # orjson writes NaN/Infinity as null; mirror that rather than emitting invalid JSON
+  if isinstance(value, float) and (value != value or value in (float('inf'), float('-inf'))):
+    return None
+  if isinstance(value, dict):
+    return dict((key, _finite(item)) for key, item in value.items())
+  if isinstance(value, (list, tuple)):
+    return [_finite(item) for item in value]
+  return value
+
+
+def _json_default(value):
+  # The types orjson serializes natively, encoded the same way
+  if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+    return value.isoformat()
+  if isinstance(value, uuid.UUID):
+    return str(value)
+  if isinstance(value, enum.Enum):
+    return value.value
+  if dataclasses.is_dataclass(value) and not isinstance(value, type):
+    return _finite(dataclasses.asdict(value))
+  if numpy is not None and isinstance(value, numpy.ndarray):
+    return _finite(value.tolist())
+  if numpy is not None and isinstance(value, numpy.generic):
+    return _finite(value.item())
+  raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+
+def _dumps(body):
+  if orjson is not None:
+    return orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+  try:
+    data = json.dumps(body, default=_json_default, separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+  except ValueError as error:
+    # Only NaN/Infinity are worth a second pass; anything else (e.g. a circular reference) would fail again
+    if not str(error).startswith('Out of range float values'):
+      raise
+    try:
+      body = _finite(body)
+    except RecursionError:
+      raise ValueError('Circular reference detected') from None
+    data = json.dumps(body, default=_json_default, separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+  return data.encode('utf-8')
+
+
+def _json_body(body):
+  # Keyword arguments for sending body as JSON, serialized to identical bytes with or without orjson
+  return {'data': _dumps(body), 'headers': {'content-type': 'application/json'}}
+
+
+class _ByteStream(object):
+  # Minimal file-like wrapper so ijson can read a streamed httpx response
+  def __init__(self, chunks):
+    self._chunks = iter(chunks)
+
+  def read(self, size = -1):
+    # ijson probes the stream type with read(0); otherwise an empty read means EOF, so skip empty chunks
+    if size == 0:
+      return b''
+    for chunk in self._chunks:
+      if chunk:
+        return chunk
+    return b''
+
+
+class _JSONStream(object):
+  # Items parsed incrementally off a streamed response, so only one is held in memory at a time.
+  # The response is released when exhausted, on close() or leaving a with block, or when garbage
+  # collected, so a stream that is never iterated does not keep its pooled connection checked out.
+  def __init__(self, response, prefix):
+    self._response = response
+    if ijson is None:
+      response.close()
+      raise Client_Exception('ijson is required for streaming: pip install sotaog_public_api_client[streaming]')
+    if httpx is not None and isinstance(response, httpx.Response):
+      source = _ByteStream(response.iter_bytes())
+    else:
+      response.raw.decode_content = True
+      source = response.raw
+    self._items = ijson.items(source, prefix, use_float=True)
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    try:
+      return next(self._items)
+    except BaseException:
+      self.close()
+      raise
+
+
+  def close(self):
+    self._response.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def __del__(self):
+    self.close()
+
+
+def _filter_assets(response, facility, asset_type):
+  if simdjson is not None:
+    # Lazy parse: keys are looked up in place and only matching assets become dicts
+    assets = simdjson.Parser().parse(response.content)
+    return [asset.as_dict() for asset in assets
+            if (not facility or asset.get('facility') == facility) and (not asset_type or asset.get('asset_type') == asset_type)]
+  assets = _json(response)
+  if facility:
+    assets = [asset for asset in assets if 'facility' in asset and asset['facility'] == facility]
+  if asset_type:
+    assets = [asset for asset in assets if 'asset_type' in asset and asset['asset_type'] == asset_type]
+  return assets
+
+
+def _token_expiry(auth):
+  # Prefer the OAuth expires_in, otherwise read the (unverified) exp claim of a JWT access token
+  if auth.get('expires_in'):
+    return time.time() + float(auth['expires_in'])
+  try:
+    payload = auth['access_token'].split('.')[1]
+    payload += '=' * (-len(payload) % 4)
+    return float(json.loads(base64.urlsafe_b64decode(payload).decode('utf-8'))['exp'])
+  except (IndexError, KeyError, TypeError, ValueError):
+    return None
+
+
+def _run_concurrently(func, asset_ids, workers):
+  # requests.Session is safe to share between threads for independent requests
+  with ThreadPoolExecutor(max_workers=workers) as executor:
+    futures = [(asset_id, executor.submit(func, asset_id)) for asset_id in asset_ids]
+  return [(asset_id, None if future.exception() else future.result(), future.exception()) for asset_id, future in futures]
 
 
 class Client():
-  def __init__(self, url, client_id, client_secret, customer_id = None):
-    self.session = requests.Session()
+  def __init__(self, url, client_id, client_secret, customer_id = None, pool_maxsize = 64, cache_ttl = 300, cache_size = 4096, transport = 'requests'):
+    if transport == 'httpx':
+      # Preferred for bulk use: HTTP/2 multiplexes concurrent requests over one connection
+      if httpx is None:
+        raise Client_Exception('httpx is required for the httpx transport: pip install sotaog_public_api_client[async]')
+      limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+      self.session = httpx.Client(transport=httpx.HTTPTransport(http2=True, retries=3, limits=limits), **_HTTPX_OPTIONS)
+    elif transport == 'requests':
+      self.session = requests.Session()
+      # The default adapter only keeps 10 pooled connections, which threaded callers exhaust
+      retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False)
+      adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retries)
+      self.session.mount('https://', adapter)
+      self.session.mount('http://', adapter)
+    else:
+      raise Client_Exception('Unknown transport {}'.format(transport))
+    self.transport = transport
     self.url = url.rstrip('/')
+    self._v1 = self.url + '/v1'
     self.customer_id = customer_id
-    logger.info('Initializing Sotaog API client for {}'.format(url))
-    logger.debug('Authenticating to API: {}'.format(url))
+    self.cache_ttl = cache_ttl
+    self.cache_size = cache_size
+    self._cache = OrderedDict()
+    self._cache_lock = threading.Lock()
+    self._client_id = client_id
+    self._client_secret = client_secret
+    self._auth_lock = threading.Lock()
+    logger.info('Initializing Sotaog API client for %s', url)
+    self._authenticate()
+
+  def _authenticate(self):
+    logger.debug('Authenticating to API: %s', self.url)
     data = {
         'grant_type': 'client_credentials'
     }
-    result = self.session.post('{}/v1/authenticate'.format(self.url), data=data, auth=(client_id, client_secret))
-    if result.status_code == 200:
-      self.token = result.json()['access_token']
-      logger.debug('Token: {}'.format(self.token))
-    else:
-      raise Client_Exception('Unable to authenticate to API')
+    result = self._send('POST', self._v1 + '/authenticate', data=data, auth=(self._client_id, self._client_secret))
+    if result.status_code == 200:
+      auth = _json(result)
+      self.token = auth['access_token']
+      self._token_expires = _token_expiry(auth)
+      logger.debug('Token: %s', self.token)
+      # Built once and merged by the session on every request
+      self.session.headers.update(self._get_headers())
+    else:
+      raise Client_Exception('Unable to authenticate to API', response=result)
+
+  def _token_expired(self):
+    # Refresh slightly early so a request never goes out with a token about to lapse
+    return self._token_expires is not None and time.time() > self._token_expires - 30
+
+  def _ensure_token(self):
+    if self._token_expired():
+      with self._auth_lock:
+        if self._token_expired():
+          self._authenticate()
+
+  def close(self):
+    self.session.close()
+
+  def _send(self, method, url, stream = False, **kwargs):
+    if self.transport == 'httpx':
+      if isinstance(kwargs.get('data'), bytes):
+        kwargs['content'] = kwargs.pop('data')
+      auth = kwargs.pop('auth', httpx.USE_CLIENT_DEFAULT)
+      request = self.session.build_request(method, url, **kwargs)
+      return self.session.send(request, stream=stream, auth=auth)
+    return self.session.request(method, url, stream=stream, **kwargs)
+
+  def _request(self, method, url, **kwargs):
+    self._ensure_token()
+    token = self.token
+    result = self._send(method, url, **kwargs)
+    if result.status_code == 401:
+      # The token was rejected before its expiry, authenticate again and retry once
+      result.close()
+      with self._auth_lock:
+        if self.token == token:
+          self._authenticate()
+      result = self._send(method, url, **kwargs)
+    return result
+
+  def _stream(self, result, error, prefix):
+    if result.status_code != 200:
+      # Load the error body before raising so Client_Exception.body works and the connection is released
+      if self.transport == 'httpx':
+        result.read()
+      else:
+        result.content
+      result.close()
+      raise Client_Exception(error, response=result)
+    return _JSONStream(result, prefix)
 
   def _get_headers(self):
     headers = {
@@ -37,847 +362,583 @@ class Client():
       headers['x-sotaog-customer-id'] = self.customer_id
     return headers
 
+  def _get_json(self, url, error, params = None):
+    result = self._request('GET', url, params=params)
+    if result.status_code != 200:
+      raise Client_Exception(error, response=result)
+    return _json(result)
+
+  def invalidate(self):
+    with self._cache_lock:
+      self._cache.clear()
+
+  def _get_cached(self, url, error, params = None):
+    # Reference data is served from memory for cache_ttl seconds, then revalidated with ETag/Last-Modified
+    if not self.cache_ttl:
+      return self._get_json(url, error, params=params)
+    key = (url, tuple(sorted(params.items())) if params else None)
+    with self._cache_lock:
+      entry = self._cache.get(key)
+      if entry:
+        # Re-insert so eviction drops the least recently used entry
+        self._cache[key] = self._cache.pop(key)
+    if entry and entry['expires'] > time.time():
+      # The raw body is cached and decoded per hit so callers never share (and mutate) one object
+      return _loads(entry['content'])
+    headers = {}
+    if entry and entry['etag']:
+      headers['if-none-match'] = entry['etag']
+    if entry and entry['last_modified']:
+      headers['if-modified-since'] = entry['last_modified']
+    result = self._request('GET', url, params=params, headers=headers)
+    if result.status_code == 304 and entry:
+      content = entry['content']
+    elif result.status_code == 200:
+      content = result.content
+    else:
+      raise Client_Exception(error, response=result)
+    with self._cache_lock:
+      self._cache.pop(key, None)
+      self._cache[key] = {
+          'content': content,
+          'expires': time.time() + self.cache_ttl,
+          'etag': result.headers.get('etag') or (entry and entry['etag']),
+          'last_modified': result.headers.get('last-modified') or (entry and entry['last_modified'])
+      }
+      while len(self._cache) > self.cache_size:
+        self._cache.popitem(last=False)
+    return _loads(content)
+
   def get_alarm_services(self):
     logger.debug('Getting alarm services')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/alarm-services'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      alarm_services = result.json()
-      logger.debug('Alarm Services: {}'.format(alarm_services))
-      return alarm_services
-    else:
-      raise Client_Exception('Unable to retrieve alarm services')
+    alarm_services = self._get_json(self._v1 + '/alarm-services', 'Unable to retrieve alarm services')
+    logger.debug('Alarm Services: %s', alarm_services)
+    return alarm_services
 
   def get_alarm_service(self, alarm_service_id):
-    logger.debug('Getting alarm service {}'.format(alarm_service_id))
-    headers = self._get_headers()
-    url = '{}/v1/alarm-services/{}'.format(self.url, alarm_service_id)
-    result = self.session.get(url, headers=headers)
-    if result.status_code == 200:
-      alarm_service = result.json()
-      logger.debug('Alarm Service: {}'.format(alarm_service))
-      return alarm_service
-    else:
-      raise Client_Exception('Unable to retrieve alarm service {}'.format(alarm_service_id))
+    logger.debug('Getting alarm service %s', alarm_service_id)
+    url = '{}/alarm-services/{}'.format(self._v1, alarm_service_id)
+    alarm_service = self._get_cached(url, 'Unable to retrieve alarm service {}'.format(alarm_service_id))
+    logger.debug('Alarm Service: %s', alarm_service)
+    return alarm_service
 
   def get_alarms(self):
     logger.debug('Getting alarms')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/alarms'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      alarms = result.json()
-      logger.debug('Alarms: {}'.format(alarms))
-      return alarms
-    else:
-      raise Client_Exception('Unable to retrieve alarms')
+    alarms = self._get_json(self._v1 + '/alarms', 'Unable to retrieve alarms')
+    logger.debug('Alarms: %s', alarms)
+    return alarms
+
+  def iter_alarms(self, prefix = 'item'):
+    logger.debug('Streaming alarms')
+    result = self._request('GET', self._v1 + '/alarms', stream=True)
+    return self._stream(result, 'Unable to retrieve alarms', prefix)
     
   def get_custom_alarms(self):
     logger.debug('Getting alarms')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/custom-alarms'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      alarms = result.json()
-      logger.debug('Alarms: {}'.format(alarms))
-      return alarms
-    else:
-      raise Client_Exception('Unable to retrieve alarms')
+    alarms = self._get_json(self._v1 + '/custom-alarms', 'Unable to retrieve alarms')
+    logger.debug('Alarms: %s', alarms)
+    return alarms
   
   def get_custom_alarm(self,alarms_id):
     logger.debug('Getting alarms')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/custom-alarms/{}'.format(self.url, alarms_id), headers=headers)
-    if result.status_code == 200:
-      alarms = result.json()
-      logger.debug('Alarms: {}'.format(alarms))
-      return alarms
-    else:
-      raise Client_Exception('Unable to retrieve alarms')
+    alarms = self._get_json('{}/custom-alarms/{}'.format(self._v1, alarms_id), 'Unable to retrieve alarms')
+    logger.debug('Alarms: %s', alarms)
+    return alarms
   
   def get_alarm_incidents(self,alarm_id, well_id, alarm_status):
     logger.debug('Getting alarms')
-    headers = self._get_headers()
-    url = '{}/v1/custom-alarms-incidents?alarm_id={}&well_id={}&alarm_status={}'.format(self.url,alarm_id,well_id,alarm_status)   
-    result = self.session.get(url, headers=headers)
-    if result.status_code == 200:
-      alarms = result.json()
-      logger.debug('Alarms: {}'.format(alarms))
-      return alarms
-    else:
-      raise Client_Exception('Unable to retrieve alarms')
+    url = '{}/custom-alarms-incidents?alarm_id={}&well_id={}&alarm_status={}'.format(self._v1, alarm_id,well_id,alarm_status)   
+    alarms = self._get_json(url, 'Unable to retrieve alarms')
+    logger.debug('Alarms: %s', alarms)
+    return alarms
   
   def post_custom_alarm_incidents(self, incidents):
-    logger.debug('Creating Alarm Incidents {}'.format(incidents))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/custom-alarms-incidents'.format(self.url), headers=headers, json=incidents)
+    logger.debug('Creating Alarm Incidents %s', incidents)
+    result = self._request('PUT', self._v1 + '/custom-alarms-incidents', json=incidents)
     if result.status_code == 201:
-      created = result.json()
-      logger.debug('Alarms Incidents: {}'.format(created))
+      created = _json(result)
+      logger.debug('Alarms Incidents: %s', created)
       return created
     else:
-      raise Client_Exception('Unable to create Alarm Incidents')
+      raise Client_Exception('Unable to create Alarm Incidents', response=result)
 
   def get_alarm(self, asset_id, datatype = None):
-    logger.debug('Getting alarms for {}'.format(asset_id))
-    headers = self._get_headers()
-    url = '{}/v1/alarms/{}'.format(self.url, asset_id)
+    logger.debug('Getting alarms for %s', asset_id)
+    url = '{}/alarms/{}'.format(self._v1, asset_id)
     if datatype:
       url += '/{}'.format(datatype)
-    result = self.session.get(url, headers=headers)
-    if result.status_code == 200:
-      alarm = result.json()
-      logger.debug('Alarm: {}'.format(alarm))
-      return alarm
-    else:
-      raise Client_Exception('Unable to retrieve alarms for {}'.format(asset_id))
+    alarm = self._get_json(url, 'Unable to retrieve alarms for {}'.format(asset_id))
+    logger.debug('Alarm: %s', alarm)
+    return alarm
 
   def get_facilities(self):
     logger.debug('Getting facilities')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/facilities'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      facilities = result.json()
-      logger.debug('Facilities: {}'.format(facilities))
-      return facilities
-    else:
-      raise Client_Exception('Unable to retrieve facilities')
+    facilities = self._get_json(self._v1 + '/facilities', 'Unable to retrieve facilities')
+    logger.debug('Facilities: %s', facilities)
+    return facilities
 
   def get_facility(self, facility_id):
-    logger.debug('Getting facility: {}'.format(facility_id))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/facilities/{}'.format(self.url, facility_id), headers=headers)
-    if result.status_code == 200:
-      facility = result.json()
-      logger.debug('Facility: {}'.format(facility))
-      return facility
-    else:
-      raise Client_Exception('Unable to retrieve facility {}'.format(facility_id))
+    logger.debug('Getting facility: %s', facility_id)
+    url = '{}/facilities/{}'.format(self._v1, facility_id)
+    facility = self._get_cached(url, 'Unable to retrieve facility {}'.format(facility_id))
+    logger.debug('Facility: %s', facility)
+    return facility
 
   def get_facility_config(self, facility_id):
-    logger.debug('Getting config for {}'.format(facility_id))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/facilities/{}/config'.format(self.url, facility_id), headers=headers)
-
-    if result.status_code == 200:
-      config = result.json()
-      logger.debug('config: {}'.format(config))
-      return config
-    else:
-      raise Client_Exception('Unable to retrieve config')
+    logger.debug('Getting config for %s', facility_id)
+    config = self._get_json('{}/facilities/{}/config'.format(self._v1, facility_id), 'Unable to retrieve config')
+    logger.debug('config: %s', config)
+    return config
 
   def get_asset(self, asset_id, type = 'assets'):
-    logger.debug('Getting asset {} of type: {}'.format(asset_id, type))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/{}/{}'.format(self.url, type, asset_id), headers=headers)
-    if result.status_code == 200:
-      asset = result.json()
-      logger.debug('Asset: {}'.format(asset))
-      return asset
-    else:
-      raise Client_Exception('Unable to retrieve asset {} of type {}'.format(asset_id, type))
+    logger.debug('Getting asset %s of type: %s', asset_id, type)
+    url = '{}/{}/{}'.format(self._v1, type, asset_id)
+    asset = self._get_cached(url, 'Unable to retrieve asset {} of type {}'.format(asset_id, type))
+    logger.debug('Asset: %s', asset)
+    return asset
 
   def get_assets(self, type = 'assets', facility = None, asset_type = None):
-    logger.debug('Getting assets of type: {}'.format(type))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/{}'.format(self.url, type), headers=headers)
-    if result.status_code == 200:
-      assets = result.json()
-      if facility:
-        assets = [asset for asset in assets if 'facility' in asset and asset['facility'] == facility]
-      if asset_type:
-        assets = [asset for asset in assets if 'asset_type' in asset and asset['asset_type'] == asset_type]
-      logger.debug('Assets: {}'.format(assets))
+    logger.debug('Getting assets of type: %s', type)
+    params = _params(facility=facility, asset_type=asset_type)
+    result = self._request('GET', '{}/{}'.format(self._v1, type), params=params)
+    if result.status_code == 400 and params:
+      # The API rejected the filter params, fetch everything and filter below
+      result = self._request('GET', '{}/{}'.format(self._v1, type))
+    if result.status_code == 200:
+      # Re-applying the filter is cheap on a server-filtered response and keeps results correct if it was ignored
+      if facility or asset_type:
+        assets = _filter_assets(result, facility, asset_type)
+      else:
+        assets = _json(result)
+      logger.debug('Assets: %s', assets)
       return assets
     else:
-      raise Client_Exception('Unable to retrieve assets of type {}'.format(asset_type))
+      raise Client_Exception('Unable to retrieve assets of type {}'.format(asset_type), response=result)
 
   def get_asset_type(self, asset_type_id):
-    logger.debug('Getting asset type {}'.format(asset_type_id))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/asset-types/{}'.format(self.url, asset_type_id), headers=headers)
-    if result.status_code == 200:
-      asset_type = result.json()
-      logger.debug('Asset Type: {}'.format(asset_type))
-      return asset_type
-    else:
-      raise Client_Exception('Unable to retrieve asset {}'.format(asset_type_id))
+    logger.debug('Getting asset type %s', asset_type_id)
+    asset_type = self._get_json('{}/asset-types/{}'.format(self._v1, asset_type_id), 'Unable to retrieve asset {}'.format(asset_type_id))
+    logger.debug('Asset Type: %s', asset_type)
+    return asset_type
 
   def get_asset_types(self):
     logger.debug('Getting asset types')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/asset-types'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      asset_types = result.json()
-      logger.debug('Asset types: {}'.format(asset_types))
-      return asset_types
-    else:
-      raise Client_Exception('Unable to get asset types')
+    asset_types = self._get_json(self._v1 + '/asset-types', 'Unable to get asset types')
+    logger.debug('Asset types: %s', asset_types)
+    return asset_types
 
   def get_compressors(self):
     logger.debug('Getting compressors')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/compressors'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      compressors = result.json()
-      logger.debug('Compressors: {}'.format(compressors))
-      return compressors
-    else:
-      raise Client_Exception('Unable to get compressors')
+    compressors = self._get_json(self._v1 + '/compressors', 'Unable to get compressors')
+    logger.debug('Compressors: %s', compressors)
+    return compressors
 
   def get_customers(self):
     logger.debug('Getting customers')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/customers'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      customers = result.json()
-      logger.debug('Customers: {}'.format(customers))
-      return customers
-    else:
-      raise Client_Exception('Unable to get customers')
+    customers = self._get_json(self._v1 + '/customers', 'Unable to get customers')
+    logger.debug('Customers: %s', customers)
+    return customers
 
   def get_customer(self, customer_id):
-    logger.debug('Getting customer {}'.format(customer_id))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/customers/{}'.format(self.url, customer_id), headers=headers)
-    if result.status_code == 200:
-      customer = result.json()
-      logger.debug('Customer: {}'.format(customer))
-      return customer
-    else:
-      raise Client_Exception('Unable to get customer {}'.format(customer_id))
+    logger.debug('Getting customer %s', customer_id)
+    customer = self._get_json('{}/customers/{}'.format(self._v1, customer_id), 'Unable to get customer {}'.format(customer_id))
+    logger.debug('Customer: %s', customer)
+    return customer
 
   def get_datatypes(self, group_by='asset'):
     logger.debug('Getting datatypes')
-    headers = self._get_headers()
-    params = {}
-    if group_by:
-      params['group_by'] = group_by
-    result = self.session.get('{}/v1/datatypes'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      datatypes = result.json()
-      logger.debug('Datatypes: {}'.format(datatypes))
-      return datatypes
-    else:
-      raise Client_Exception('Unable to get datatypes')
+    params = {'group_by': group_by} if group_by else None
+    datatypes = self._get_json(self._v1 + '/datatypes', 'Unable to get datatypes', params=params)
+    logger.debug('Datatypes: %s', datatypes)
+    return datatypes
 
   def get_datatype(self, datatype_id):
-    logger.debug('Getting datatype {}'.format(datatype_id))
-    headers = self._get_headers()
+    logger.debug('Getting datatype %s', datatype_id)
     params = {'group_by': 'asset'}
-    result = self.session.get('{}/v1/datatypes/{}'.format(self.url, datatype_id), headers=headers, params=params)
-    if result.status_code == 200:
-        datatype = result.json()
-        logger.debug('Datatype: {}'.format(datatype))
-        return datatype
-    else:
-        raise Client_Exception('Unable to get datatype {}'.format(datatype_id))
+    url = '{}/datatypes/{}'.format(self._v1, datatype_id)
+    datatype = self._get_cached(url, 'Unable to get datatype {}'.format(datatype_id), params=params)
+    logger.debug('Datatype: %s', datatype)
+    return datatype
 
   def get_datapoints(self, asset_datatypes, start_ts = None, end_ts = None, sort = 'desc', limit = 100):
-    logger.debug('Getting datapoints for asset_datatypes: {}'.format(asset_datatypes))
-    headers = self._get_headers()
-    body = {
-        'asset_datatypes': asset_datatypes
-    }
-    if start_ts:
-      body['start_ts'] = start_ts
-    if end_ts:
-      body['end_ts'] = end_ts
-    if sort:
-      body['sort'] = sort
-    if limit:
-      body['limit'] = limit
-    result = self.session.post('{}/v1/datapoints'.format(self.url), headers=headers, json=body)
+    logger.debug('Getting datapoints for asset_datatypes: %s', asset_datatypes)
+    body = _datapoints_body(asset_datatypes, start_ts, end_ts, sort, limit)
+    result = self._request('POST', self._v1 + '/datapoints', **_json_body(body))
     if result.status_code == 200:
-      datapoints = result.json()
-      logger.debug('Datapoints: {}'.format(datapoints))
+      datapoints = _json(result)
+      logger.debug('Datapoints: %s', datapoints)
       return datapoints
     else:
-      logger.debug(result.json())
-      raise Client_Exception('Unable to get datapoints')
+      raise Client_Exception('Unable to get datapoints', response=result)
+
+  def iter_datapoints(self, asset_datatypes, start_ts = None, end_ts = None, sort = 'desc', limit = 100, prefix = 'item'):
+    logger.debug('Streaming datapoints for asset_datatypes: %s', asset_datatypes)
+    body = _datapoints_body(asset_datatypes, start_ts, end_ts, sort, limit)
+    result = self._request('POST', self._v1 + '/datapoints', stream=True, **_json_body(body))
+    return self._stream(result, 'Unable to get datapoints', prefix)
+
+  def get_datapoints_as_arrays(self, asset_datatypes, start_ts = None, end_ts = None, sort = 'desc', limit = 100, columns = None, prefix = 'item'):
+    # Column-oriented result: one numeric numpy array per field instead of a list of dicts
+    if numpy is None:
+      raise Client_Exception('numpy is required for array results: pip install sotaog_public_api_client[arrays]')
+    columns = columns or {'ts': 'int64', 'value': 'float64'}
+    dtypes = {}
+    for name, dtype in columns.items():
+      try:
+        dtypes[name] = numpy.dtype(dtype)
+      except TypeError:
+        raise Client_Exception('Unknown dtype {!r} for column {}'.format(dtype, name))
+      if dtypes[name].kind not in 'iuf' or dtypes[name].char not in array.typecodes:
+        raise Client_Exception('Column {} must be an integer or float32/float64 dtype, not {}'.format(name, dtypes[name]))
+    # array.array stores unboxed values and grows geometrically; numpy then wraps the buffer without copying
+    buffers = {name: array.array(dtype.char) for name, dtype in dtypes.items()}
+    with self.iter_datapoints(asset_datatypes, start_ts, end_ts, sort, limit, prefix) as datapoints:
+      for index, datapoint in enumerate(datapoints):
+        for name, buffer in buffers.items():
+          value = datapoint.get(name)
+          if value is None and dtypes[name].kind == 'f':
+            value = float('nan')
+          try:
+            buffer.append(value)
+          except (TypeError, OverflowError):
+            raise Client_Exception('Datapoint {} has value {!r} for column {}, which does not fit {}'.format(index, value, name, dtypes[name]))
+    return {name: numpy.frombuffer(buffers[name], dtype=dtype) for name, dtype in dtypes.items()}
 
   def get_oil_gas_price(self, start_date = None, end_date = None):
     logger.debug('Getting prices')
-    headers = self._get_headers()
-    params = {}
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    result = self.session.get('{}/v1/financials/oil-gas-price'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      prices = result.json()
-      logger.debug('Oil Gas Prices: {}'.format(prices))
-      return prices
-    else:
-      raise Client_Exception('Unable to retrieve Oil Gas prices')
+    params = _params(start_date=start_date, end_date=end_date)
+    prices = self._get_json(self._v1 + '/financials/oil-gas-price', 'Unable to retrieve Oil Gas prices', params=params)
+    logger.debug('Oil Gas Prices: %s', prices)
+    return prices
 
   def get_asset_datapoints(self, asset_id, datatypes = [], start_ts = None, end_ts = None, sort = 'desc', limit = 100):
-    logger.debug('Getting datapoints for asset: {}'.format(asset_id))
-    headers = self._get_headers()
-    params = {}
-    if datatypes:
-      params['datatypes'] = datatypes
-    if start_ts:
-      params['start_ts'] = start_ts
-    if end_ts:
-      params['end_ts'] = end_ts
-    if sort:
-      params['sort'] = sort
-    if limit:
-      params['limit'] = limit
-    result = self.session.get('{}/v1/datapoints/{}'.format(self.url, asset_id), headers=headers, params=params)
-    if result.status_code == 200:
-      datapoints = result.json()
-      logger.debug('Datapoints: {}'.format(datapoints))
-      return datapoints
-    else:
-      raise Client_Exception('Unable to get datapoints')
+    logger.debug('Getting datapoints for asset: %s', asset_id)
+    params = _params(datatypes=datatypes, start_ts=start_ts, end_ts=end_ts, sort=sort, limit=limit)
+    datapoints = self._get_json('{}/datapoints/{}'.format(self._v1, asset_id), 'Unable to get datapoints', params=params)
+    logger.debug('Datapoints: %s', datapoints)
+    return datapoints
+
+  def iter_asset_datapoints(self, asset_id, datatypes = [], start_ts = None, end_ts = None, sort = 'desc', limit = 100, prefix = 'item'):
+    logger.debug('Streaming datapoints for asset: %s', asset_id)
+    params = _params(datatypes=datatypes, start_ts=start_ts, end_ts=end_ts, sort=sort, limit=limit)
+    result = self._request('GET', '{}/datapoints/{}'.format(self._v1, asset_id), params=params, stream=True)
+    return self._stream(result, 'Unable to get datapoints', prefix)
+
+  def get_asset_datapoints_bulk(self, asset_ids, workers = 16, **kwargs):
+    asset_ids = list(asset_ids)
+    logger.debug('Getting datapoints for %s assets', len(asset_ids))
+    outcomes = _run_concurrently(lambda asset_id: self.get_asset_datapoints(asset_id, **kwargs), asset_ids, workers)
+    return _bulk_results('get datapoints', outcomes)
 
   def get_swd_networks(self, facility = None):
     logger.debug('Getting SWD networks')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/swd-networks'.format(self.url), headers=headers)
+    params = _params(facility=facility)
+    result = self._request('GET', self._v1 + '/swd-networks', params=params)
+    if result.status_code == 400 and params:
+      result = self._request('GET', self._v1 + '/swd-networks')
     if result.status_code == 200:
-      swd_networks = result.json()
-      logger.debug('SWD Networks: {}'.format(swd_networks))
+      swd_networks = _json(result)
       if facility:
         swd_networks = [swd_network for swd_network in swd_networks if facility in swd_network['facilities']]
-      logger.debug('SWD Networks: {}'.format(swd_networks))
+      logger.debug('SWD Networks: %s', swd_networks)
       return swd_networks
     else:
-      raise Client_Exception('Unable to retrieve SWD networks')
+      raise Client_Exception('Unable to retrieve SWD networks', response=result)
 
   def get_truck_tickets(self, facility = None, type = None, start_ts = None, end_ts = None):
     logger.debug('Getting truck tickets')
-    headers = self._get_headers()
-    params = {}
-    if start_ts:
-      params['start_ts'] = start_ts
-    if end_ts:
-      params['end_ts'] = end_ts
-    if type:
-      params['type'] = type
-    if facility:
-      params['facility'] = facility
-    result = self.session.get('{}/v1/truck-tickets'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      truck_tickets = result.json()
-      logger.debug('Truck tickets: {}'.format(truck_tickets))
-      return truck_tickets
-    else:
-      raise Client_Exception('Unable to retrieve truck tickets')
+    params = _params(start_ts=start_ts, end_ts=end_ts, type=type, facility=facility)
+    truck_tickets = self._get_json(self._v1 + '/truck-tickets', 'Unable to retrieve truck tickets', params=params)
+    logger.debug('Truck tickets: %s', truck_tickets)
+    return truck_tickets
 
   def get_auto_truck_tickets(self, facility = None, type = None, start_ts = None, end_ts = None):
     logger.debug('Getting auto truck tickets')
-    headers = self._get_headers()
-    params = {}
-    if start_ts:
-      params['start_ts'] = start_ts
-    if end_ts:
-      params['end_ts'] = end_ts
-    if type:
-      params['type'] = type
-    if facility:
-      params['facility'] = facility
-    result = self.session.get('{}/v1/auto-truck-tickets'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      truck_tickets = result.json()
-      logger.debug('Auto Truck tickets: {}'.format(truck_tickets))
-      return truck_tickets
-    else:
-      raise Client_Exception('Unable to retrieve truck tickets')
+    params = _params(start_ts=start_ts, end_ts=end_ts, type=type, facility=facility)
+    truck_tickets = self._get_json(self._v1 + '/auto-truck-tickets', 'Unable to retrieve truck tickets', params=params)
+    logger.debug('Auto Truck tickets: %s', truck_tickets)
+    return truck_tickets
 
   def post_truck_ticket(self, truck_ticket):
-    logger.debug('Creating truck ticket {}'.format(truck_ticket))
-    headers = self._get_headers()
-    result = self.session.post('{}/v1/truck-tickets'.format(self.url), headers=headers, json=truck_ticket)
+    logger.debug('Creating truck ticket %s', truck_ticket)
+    result = self._request('POST', self._v1 + '/truck-tickets', json=truck_ticket)
     if result.status_code == 201:
-      created_ticket = result.json()
-      logger.debug('Truck ticket: {}'.format(created_ticket))
+      created_ticket = _json(result)
+      logger.debug('Truck ticket: %s', created_ticket)
       return created_ticket
     else:
-      raise Client_Exception('Unable to create truck ticket')
+      raise Client_Exception('Unable to create truck ticket', response=result)
 
   def post_auto_truck_ticket(self, truck_ticket):
-    logger.debug('Creating auto truck ticket {}'.format(truck_ticket))
-    headers = self._get_headers()
-    result = self.session.post('{}/v1/auto-truck-tickets'.format(self.url), headers=headers, json=truck_ticket)
+    logger.debug('Creating auto truck ticket %s', truck_ticket)
+    result = self._request('POST', self._v1 + '/auto-truck-tickets', json=truck_ticket)
     if result.status_code == 201:
-      created_ticket = result.json()
-      logger.debug('Auto Truck ticket: {}'.format(created_ticket))
+      created_ticket = _json(result)
+      logger.debug('Auto Truck ticket: %s', created_ticket)
       return created_ticket
     else:
-      raise Client_Exception('Unable to create auto truck ticket')
+      raise Client_Exception('Unable to create auto truck ticket', response=result)
 
   def put_truck_ticket(self, truck_ticket_id, timestamp,  truck_ticket):
-    logger.debug('Putting truck_ticket for {}'.format(truck_ticket_id))
-    headers = self._get_headers()
-    result = self.session.post('{}/v1/truck-tickets/{}/{}'.format(self.url, truck_ticket_id, timestamp), headers=headers, json=truck_ticket)
+    logger.debug('Putting truck_ticket for %s', truck_ticket_id)
+    result = self._request('POST', '{}/truck-tickets/{}/{}'.format(self._v1, truck_ticket_id, timestamp), json=truck_ticket)
     if result.status_code != 201 and result.status_code != 200:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to update truck-ticket')
+      raise Client_Exception('Unable to update truck-ticket', response=result)
 
   def put_truck_ticket_image(self, truck_ticket_id, timestamp, image, content_type):
-    logger.debug('Creating truck ticket image size {}, content_type {}'.format(len(image), content_type))
-    headers = self._get_headers()
-    headers['content-type'] = content_type
-    result = self.session.put('{}/v1/truck-tickets/{}/{}/image'.format(self.url, truck_ticket_id, timestamp), headers=headers, data=image)
+    logger.debug('Creating truck ticket image size %s, content_type %s', len(image), content_type)
+    headers = {'content-type': content_type}
+    result = self._request('PUT', '{}/truck-tickets/{}/{}/image'.format(self._v1, truck_ticket_id, timestamp), headers=headers, data=image)
     if result.status_code != 204:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to create truck ticket image')
+      raise Client_Exception('Unable to create truck ticket image', response=result)
 
   def put_alarm(self, asset_id, datatype, alarm):
-    logger.debug('Creating alarm for {} {}'.format(asset_id, datatype))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/alarms/{}/{}'.format(self.url, asset_id, datatype), headers=headers, json=alarm)
+    logger.debug('Creating alarm for %s %s', asset_id, datatype)
+    result = self._request('PUT', '{}/alarms/{}/{}'.format(self._v1, asset_id, datatype), json=alarm)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Exception('Unable to create alarm')
+      raise Client_Exception('Unable to create alarm', response=result)
 
   def post_datapoints(self, asset_id, datapoints):
     logger.debug('Posting datapoints')
-    headers = self._get_headers()
-    result = self.session.post('{}/v1/datapoints/{}'.format(self.url, asset_id), headers=headers, json=datapoints)
+    result = self._request('POST', '{}/datapoints/{}'.format(self._v1, asset_id), **_json_body(datapoints))
     if result.status_code != 202:
-      logger.exception(result.json())
-      raise Exception('Unable to post datapoints')
+      raise Client_Exception('Unable to post datapoints', response=result)
+
+  def post_datapoints_bulk(self, datapoints_by_asset, workers = 16):
+    logger.debug('Posting datapoints for %s assets', len(datapoints_by_asset))
+    outcomes = _run_concurrently(lambda asset_id: self.post_datapoints(asset_id, datapoints_by_asset[asset_id]), list(datapoints_by_asset), workers)
+    _bulk_results('post datapoints', outcomes)
 
   def batch_put_well_production(self, production):
-    logger.debug('Creating well production for {}'.format(production))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/wells/production'.format(self.url), headers=headers, json=production)
+    logger.debug('Creating well production for %s', production)
+    result = self._request('PUT', self._v1 + '/wells/production', json=production)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Exception('Unable to batch create well production')
+      raise Client_Exception('Unable to batch create well production', response=result)
 
   def put_well_production(self, well_id, date, production):
-    logger.debug('Creating well production for {} {}: {}'.format(well_id, date, production))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/wells/production/{}/{}'.format(self.url, well_id, date), headers=headers, json=production)
+    logger.debug('Creating well production for %s %s: %s', well_id, date, production)
+    result = self._request('PUT', '{}/wells/production/{}/{}'.format(self._v1, well_id, date), json=production)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Exception('Unable to create well production')
+      raise Client_Exception('Unable to create well production', response=result)
 
   def list_well_production(self, well_ids = None, facility_ids = None, start_date = None, end_date = None):
     logger.debug('Getting well production')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if facility_ids:
-      params['facility_ids'] = facility_ids
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    result = self.session.get('{}/v1/wells/production'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      well_production = result.json()
-      logger.debug('Well production: {}'.format(well_production))
-      return well_production
-    else:
-      raise Client_Exception('Unable to retrieve well production')
+    params = _params(well_ids=well_ids, facility_ids=facility_ids, start_date=start_date, end_date=end_date)
+    well_production = self._get_json(self._v1 + '/wells/production', 'Unable to retrieve well production', params=params)
+    logger.debug('Well production: %s', well_production)
+    return well_production
     
   def list_well_optimised_production(self, well_ids = None, facility_ids = None):
     logger.debug('Getting well optimised production')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if facility_ids:
-      params['facility_ids'] = facility_ids
-
-    result = self.session.get('{}/v1/wells/optimized-production'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      well_production = result.json()
-      logger.debug('Well optimised production: {}'.format(well_production))
-      return well_production
-    else:
-      raise Client_Exception('Unable to retrieve well optimised production')    
+    params = _params(well_ids=well_ids, facility_ids=facility_ids)
+
+    well_production = self._get_json(self._v1 + '/wells/optimized-production', 'Unable to retrieve well optimised production', params=params)
+    logger.debug('Well optimised production: %s', well_production)
+    return well_production
 
   def get_critical_rate_analysis(self, well_id, refresh = None, start_date = None, end_date = None):
     logger.debug('Getting Critical Rate Data')
-    headers = self._get_headers()
-    params = {}
-    if refresh:
-      params['refresh'] = refresh
+    params = _params(refresh=refresh)
     if start_date and end_date:
       params['start_date'] = start_date
       params['end_date'] = end_date
-    result = self.session.get('{}/v1/wells/{}/critical-rate-analysis'.format(self.url,well_id), headers=headers, params=params)
-    if result.status_code == 200:
-      well_mgmt = result.json()
-      logger.debug('Well Mgmt Data: {}'.format(well_mgmt))
-      return well_mgmt
-    else:
-      raise Client_Exception('Unable to retrieve Critical Rate Data')
+    well_mgmt = self._get_json('{}/wells/{}/critical-rate-analysis'.format(self._v1, well_id), 'Unable to retrieve Critical Rate Data', params=params)
+    logger.debug('Well Mgmt Data: %s', well_mgmt)
+    return well_mgmt
 
   def list_well_daily_warehouse(self, well_ids = None, facility_ids = None, start_date = None, end_date = None):
     logger.debug('Getting well warehouse')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if facility_ids:
-      params['facility_ids'] = facility_ids
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    result = self.session.get('{}/v1/wells/warehouse'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      well_warehouse = result.json()
-      logger.debug('Well warehouse: {}'.format(well_warehouse))
-      return well_warehouse
-    else:
-      raise Client_Exception('Unable to retrieve well warehouse')
+    params = _params(well_ids=well_ids, facility_ids=facility_ids, start_date=start_date, end_date=end_date)
+    well_warehouse = self._get_json(self._v1 + '/wells/warehouse', 'Unable to retrieve well warehouse', params=params)
+    logger.debug('Well warehouse: %s', well_warehouse)
+    return well_warehouse
 
   def list_well_status(self, well_ids = None):
     logger.debug('Getting well status')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    result = self.session.get('{}/v1/wells/status/latest'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      well_status = result.json()
-      logger.debug('Well status: {}'.format(well_status))
-      return well_status
-    else:
-      raise Client_Exception('Unable to retrieve well status')
+    params = _params(well_ids=well_ids)
+    well_status = self._get_json(self._v1 + '/wells/status/latest', 'Unable to retrieve well status', params=params)
+    logger.debug('Well status: %s', well_status)
+    return well_status
 
   def get_well_config(self, well_id):
-    logger.debug('Getting config for {}'.format(well_id))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/wells/{}/config'.format(self.url, well_id), headers=headers)
-
-    if result.status_code == 200:
-      config = result.json()
-      logger.debug('config: {}'.format(config))
-      return config
-    else:
-      raise Client_Exception('Unable to retrieve config')
+    logger.debug('Getting config for %s', well_id)
+    config = self._get_json('{}/wells/{}/config'.format(self._v1, well_id), 'Unable to retrieve config')
+    logger.debug('config: %s', config)
+    return config
 
   def get_well_type_curve(self, well_id):
-    logger.debug('Getting type curve for {}'.format(well_id))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/wells/{}/type-curve'.format(self.url, well_id), headers=headers)
-
-    if result.status_code == 200:
-      type_curve = result.json()
-      logger.debug('Type curve: {}'.format(type_curve))
-      return type_curve
-    else:
-      raise Client_Exception('Unable to retrieve type curve')
+    logger.debug('Getting type curve for %s', well_id)
+    type_curve = self._get_json('{}/wells/{}/type-curve'.format(self._v1, well_id), 'Unable to retrieve type curve')
+    logger.debug('Type curve: %s', type_curve)
+    return type_curve
 
   def get_type_curves(self, well_ids = None, facility_ids = None, lease_ids = None, start_date = None, end_date = None, combine = True):
     logger.debug('Getting type curves')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if facility_ids:
-      params['facility_ids'] = facility_ids
-    if lease_ids:
-      params['lease_ids'] = lease_ids
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    params['combine'] = combine
-    result = self.session.get('{}/v1/type-curves'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      curves = result.json()
-      logger.debug('Type curves: {}'.format(curves))
-      return curves
-    else:
-      raise Client_Exception('Unable to retrieve type curves')
+    params = dict(_params(well_ids=well_ids, facility_ids=facility_ids, lease_ids=lease_ids, start_date=start_date, end_date=end_date), combine=combine)
+    curves = self._get_json(self._v1 + '/type-curves', 'Unable to retrieve type curves', params=params)
+    logger.debug('Type curves: %s', curves)
+    return curves
 
   def batch_well_type_curve(self, well_id, curves):
-    logger.debug('Creating type curve for {}'.format(well_id))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/wells/{}/type-curve'.format(self.url, well_id), headers=headers, json=curves)
+    logger.debug('Creating type curve for %s', well_id)
+    result = self._request('PUT', '{}/wells/{}/type-curve'.format(self._v1, well_id), json=curves)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to create well type curves')
+      raise Client_Exception('Unable to create well type curves', response=result)
 
   def get_well_tpr_ipr_curve(self, well_id, refresh):
-    logger.debug('Getting TPR/IPR curve for {}'.format(well_id))
-    headers = self._get_headers()
-    params = {}
-    if refresh:
-      params['refresh'] = refresh
-    result = self.session.get('{}/v1/wells/{}/tpr-ipr-curve'.format(self.url, well_id), headers=headers, params=params)
-    if result.status_code == 200:
-      data = result.json()
-      logger.debug('TPR/IPR curve data: {}'.format(data))
-      return data
-    else:
-      raise Client_Exception('Unable to retrieve IPR/TPR curve')
+    logger.debug('Getting TPR/IPR curve for %s', well_id)
+    params = _params(refresh=refresh)
+    data = self._get_json('{}/wells/{}/tpr-ipr-curve'.format(self._v1, well_id), 'Unable to retrieve IPR/TPR curve', params=params)
+    logger.debug('TPR/IPR curve data: %s', data)
+    return data
       
   def get_res_mgmt_plots(self, well_id, refresh):
-    logger.debug('Getting resevior mgmt plot data for {}'.format(well_id))
-    headers = self._get_headers()
-    params = {}
-    if refresh:
-      params['refresh'] = refresh
-    result = self.session.get('{}/v1/wells/{}/res_mgmt_plots'.format(self.url, well_id), headers=headers, params=params)
-    if result.status_code == 200:
-      data = result.json()
-      logger.debug('resevior mgmt plot data: {}'.format(data))
-      return data
-    else:
-      raise Client_Exception('Unable to retrieve resevior mgmt plot data')
+    logger.debug('Getting resevior mgmt plot data for %s', well_id)
+    params = _params(refresh=refresh)
+    data = self._get_json('{}/wells/{}/res_mgmt_plots'.format(self._v1, well_id), 'Unable to retrieve resevior mgmt plot data', params=params)
+    logger.debug('resevior mgmt plot data: %s', data)
+    return data
       
   def get_flowing_bottom_hole_pressure(self, well_id, refresh):
-    logger.debug('Getting flowing bottom hole pressure history for {}'.format(well_id))
-    headers = self._get_headers()
-    params = {}
-    if refresh:
-      params['refresh'] = refresh
-    result = self.session.get('{}/v1/wells/{}/flowing-bottom-hole-pressure'.format(self.url, well_id), headers=headers, params=params)
-    if result.status_code == 200:
-      data = result.json()
-      logger.debug('flowing bottom hole pressure history: {}'.format(data))
-      return data
-    else:
-      raise Client_Exception('Unable to retrieve flowing bottom hole pressure history')
+    logger.debug('Getting flowing bottom hole pressure history for %s', well_id)
+    params = _params(refresh=refresh)
+    data = self._get_json('{}/wells/{}/flowing-bottom-hole-pressure'.format(self._v1, well_id), 'Unable to retrieve flowing bottom hole pressure history', params=params)
+    logger.debug('flowing bottom hole pressure history: %s', data)
+    return data
 
   def get_financials_categories(self):
     logger.debug('Getting financials categories')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/financials-categories'.format(self.url), headers=headers)
-
-    if result.status_code == 200:
-      categories = result.json()
-      logger.debug('Financials Categories: {}'.format(categories))
-      return categories
-    else:
-      raise Client_Exception('Unable to retrieve financials categories')
+    categories = self._get_json(self._v1 + '/financials-categories', 'Unable to retrieve financials categories')
+    logger.debug('Financials Categories: %s', categories)
+    return categories
 
   def post_financials_category(self, category):
-    logger.debug('Creating financials category {}'.format(category))
-    headers = self._get_headers()
-    result = self.session.post('{}/v1/financials-categories'.format(self.url), headers=headers, json=category)
+    logger.debug('Creating financials category %s', category)
+    result = self._request('POST', self._v1 + '/financials-categories', json=category)
     if result.status_code == 201:
-      created = result.json()
-      logger.debug('Financials Category: {}'.format(created))
+      created = _json(result)
+      logger.debug('Financials Category: %s', created)
       return created
     else:
-      raise Client_Exception('Unable to create financials categories')
+      raise Client_Exception('Unable to create financials categories', response=result)
 
   def post_financials_category_price(self, price):
-    logger.debug('Creating financials category price {}'.format(price))
-    headers = self._get_headers()
-    result = self.session.post('{}/v1/financials-categories-price'.format(self.url), headers=headers, json=price)
+    logger.debug('Creating financials category price %s', price)
+    result = self._request('POST', self._v1 + '/financials-categories-price', json=price)
     if result.status_code == 201:
-      created = result.json()
-      logger.debug('Financials Category Price: {}'.format(created))
+      created = _json(result)
+      logger.debug('Financials Category Price: %s', created)
       return created
     else:
-      raise Client_Exception('Unable to create financials categories price')
+      raise Client_Exception('Unable to create financials categories price', response=result)
 
   def get_well_financials_category_prices(self, date, well_ids = None):
     logger.debug('Getting financials categories prices')
-    headers = self._get_headers()
-    params = {'date': date}
-    if well_ids:
-      params['well_ids'] = well_ids
-    result = self.session.get('{}/v1/financials-categories-well-price'.format(self.url), headers=headers, params=params)
-
-    if result.status_code == 200:
-      categories = result.json()
-      logger.debug('Financials Categories: {}'.format(categories))
-      return categories
-    else:
-      raise Client_Exception('Unable to retrieve financials categories')
+    params = dict(_params(well_ids=well_ids), date=date)
+    categories = self._get_json(self._v1 + '/financials-categories-well-price', 'Unable to retrieve financials categories', params=params)
+    logger.debug('Financials Categories: %s', categories)
+    return categories
 
   def put_financials(self, type, type_id, month, financials):
-    logger.debug('Putting financials for {} {} {}'.format(type, type_id, month))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/financials/{}/{}/{}'.format(self.url, type, type_id, month), headers=headers, json=financials)
+    logger.debug('Putting financials for %s %s %s', type, type_id, month)
+    result = self._request('PUT', '{}/financials/{}/{}/{}'.format(self._v1, type, type_id, month), json=financials)
     if result.status_code not in [200, 201]:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to put financials')
+      raise Client_Exception('Unable to put financials', response=result)
 
   def get_financials(self, asset_type = 'wells', type = 'production', well_ids = None, facility_ids = None, lease_ids = None, start_date = None, end_date = None, start_month = None, end_month = None):
     logger.debug('Getting type financials')
-    headers = self._get_headers()
-    params = {'asset_type': asset_type}
-    params = {'type': type}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if facility_ids:
-      params['facility_ids'] = facility_ids
-    if lease_ids:
-      params['lease_ids'] = lease_ids
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    if start_month:
-      params['start_month'] = start_month
-    if end_month:
-      params['end_month'] = end_month
-    result = self.session.get('{}/v1/financials/{}'.format(self.url, asset_type), headers=headers, params=params)
-    if result.status_code == 200:
-      financials = result.json()
-      logger.debug('type financials: {}'.format(financials))
-      return financials
-    else:
-      raise Client_Exception('Unable to retrieve type financials')
+    params = dict(_params(well_ids=well_ids, facility_ids=facility_ids, lease_ids=lease_ids, start_date=start_date, end_date=end_date, start_month=start_month, end_month=end_month), type=type)
+    financials = self._get_json('{}/financials/{}'.format(self._v1, asset_type), 'Unable to retrieve type financials', params=params)
+    logger.debug('type financials: %s', financials)
+    return financials
 
   def put_facility_config(self, facility_id, config):
-    logger.debug('Putting config for {}'.format(facility_id))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/facilities/{}/config'.format(self.url, facility_id), headers=headers, json=config)
+    logger.debug('Putting config for %s', facility_id)
+    result = self._request('PUT', '{}/facilities/{}/config'.format(self._v1, facility_id), json=config)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to put facility config')
+      raise Client_Exception('Unable to put facility config', response=result)
 
   def put_facility_sales(self, facility_id, month, sales):
-    logger.debug('Putting sales for {} {}'.format(facility_id, month))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/facilities/sales/{}/{}'.format(self.url, facility_id, month), headers=headers, json=sales)
+    logger.debug('Putting sales for %s %s', facility_id, month)
+    result = self._request('PUT', '{}/facilities/sales/{}/{}'.format(self._v1, facility_id, month), json=sales)
     if result.status_code not in [200, 201]:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to put sales')
+      raise Client_Exception('Unable to put sales', response=result)
 
   def list_well_sales(self, well_ids=None, start_date=None, end_date=None):
     logger.debug('Getting well sales')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    result = self.session.get('{}/v1/wells/sales/daily'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      well_sales = result.json()
-      logger.debug('Well production: {}'.format(well_sales))
-      return well_sales
-    else:
-      raise Client_Exception('Unable to retrieve well sales')
+    params = _params(well_ids=well_ids, start_date=start_date, end_date=end_date)
+    well_sales = self._get_json(self._v1 + '/wells/sales/daily', 'Unable to retrieve well sales', params=params)
+    logger.debug('Well production: %s', well_sales)
+    return well_sales
 
   def put_well_config(self, well_id, config):
-    logger.debug('Putting config for {}'.format(well_id))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/wells/{}/config'.format(self.url, well_id), headers=headers, json=config)
+    logger.debug('Putting config for %s', well_id)
+    result = self._request('PUT', '{}/wells/{}/config'.format(self._v1, well_id), json=config)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Client_Exception('Unable to put well config')
+      raise Client_Exception('Unable to put well config', response=result)
     
   def get_strapping_table(self, asset_id, type = 'tanks'):
-    logger.debug('Getting strapping table for {} of type: {}'.format(asset_id, type))
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/{}/{}/strapping'.format(self.url, type, asset_id), headers=headers)
+    logger.debug('Getting strapping table for %s of type: %s', asset_id, type)
+    result = self._request('GET', '{}/{}/{}/strapping'.format(self._v1, type, asset_id))
     if result.status_code == 200:
       strapping_table = result.content.decode()
-      logger.debug('Strapping Table: {}'.format(strapping_table))
+      logger.debug('Strapping Table: %s', strapping_table)
       reader = csv.reader(strapping_table.split('\n'), delimiter=',')
       strapping_table = {float(row[0]):float(row[1]) for row in reader}
-      logger.debug('Strapping Table: {}'.format(strapping_table))
+      logger.debug('Strapping Table: %s', strapping_table)
       return strapping_table
     else:
-      raise Client_Exception('Unable to retrieve strapping table for asset {} of type {}'.format(asset_id, type))
+      raise Client_Exception('Unable to retrieve strapping table for asset {} of type {}'.format(asset_id, type), response=result)
 
   def batch_put_well_datapoint(self, datapoint):
-    logger.debug('Creating well datapoint for {}'.format(datapoint))
-    headers = self._get_headers()
-    result = self.session.put('{}/v1/wells/datapoint'.format(self.url), headers=headers, json=datapoint)
+    logger.debug('Creating well datapoint for %s', datapoint)
+    result = self._request('PUT', self._v1 + '/wells/datapoint', json=datapoint)
     if result.status_code != 201:
-      logger.exception(result.json())
-      raise Exception('Unable to batch create well datapoint')
+      raise Client_Exception('Unable to batch create well datapoint', response=result)
 
   def get_well_datapoint(self, well_ids = None, datapoints = None, timestamps = None):
     logger.debug('Getting well datapoint')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if datapoints:
-      params['datapoints'] = datapoints
-    if timestamps:
-      params['timestamps'] = timestamps
-    result = self.session.get('{}/v1/wells/datapoint'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      well_datapoint = result.json()
-      logger.debug('Well datapoint: {}'.format(well_datapoint))
-      return well_datapoint
-    else:
-      raise Client_Exception('Unable to retrieve well datapoint')
+    params = _params(well_ids=well_ids, datapoints=datapoints, timestamps=timestamps)
+    well_datapoint = self._get_json(self._v1 + '/wells/datapoint', 'Unable to retrieve well datapoint', params=params)
+    logger.debug('Well datapoint: %s', well_datapoint)
+    return well_datapoint
       
   def get_custom_reports(self):
     logger.debug('Getting custom reports list')
-    headers = self._get_headers()
-    result = self.session.get('{}/v1/custom_reports'.format(self.url), headers=headers)
-    if result.status_code == 200:
-      reports = result.json()
-      logger.debug('custom reports: {}'.format(reports))
-      return reports
-    else:
-      raise Client_Exception('Unable to retrieve custom reports list')
+    reports = self._get_json(self._v1 + '/custom_reports', 'Unable to retrieve custom reports list')
+    logger.debug('custom reports: %s', reports)
+    return reports
   
   def list_report_tank_gauge(self, well_ids = None, start_date = None, end_date = None):
     logger.debug('Getting tank gauge report list')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if start_date:
-      params['start_date'] = start_date
-    if end_date:
-      params['end_date'] = end_date
-    result = self.session.get('{}/v1/wells/report/tank-gauge'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      reports = result.json()
-      logger.debug('custom reports: {}'.format(reports))
-      return reports
-    else:
-      raise Client_Exception('Unable to retrieve tank gauge report list')
+    params = _params(well_ids=well_ids, start_date=start_date, end_date=end_date)
+    reports = self._get_json(self._v1 + '/wells/report/tank-gauge', 'Unable to retrieve tank gauge report list', params=params)
+    logger.debug('custom reports: %s', reports)
+    return reports
 
   def list_monthly_oil_report(self, facility_ids = None, start_month = None, end_month = None):
     logger.debug('Getting oil report list')
-    headers = self._get_headers()
-    params = {}
-    if facility_ids:
-      params['facility_ids'] = facility_ids
-    if start_month:
-      params['start_month'] = start_month
-    if end_month:
-      params['end_month'] = end_month
-    result = self.session.get('{}/v1/facilities/report/oil'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      reports = result.json()
-      logger.debug('oil reports: {}'.format(reports))
-      return reports
-    else:
-      raise Client_Exception('Unable to retrieve oil report list')
+    params = _params(facility_ids=facility_ids, start_month=start_month, end_month=end_month)
+    reports = self._get_json(self._v1 + '/facilities/report/oil', 'Unable to retrieve oil report list', params=params)
+    logger.debug('oil reports: %s', reports)
+    return reports
 
   def send_sms(self, to_numbers, sms_text):
-    logger.debug('Sending sms to {}'.format(to_numbers))
-    headers = self._get_headers()
+    logger.debug('Sending sms to %s', to_numbers)
     body = { 'to_numbers': to_numbers, 'text': sms_text }
-    result = self.session.post('{}/v1/sms'.format(self.url), headers=headers, json=body)
+    result = self._request('POST', self._v1 + '/sms', json=body)
     if result.status_code == 200:
-      response = result.json()
+      response = _json(result)
       return response
     else:
-      raise Client_Exception('Unable to send sms')
+      raise Client_Exception('Unable to send sms', response=result)
   
   def get_today_predicted(self, well_ids = None, refresh = False):
     logger.debug('Getting today predicted')
-    headers = self._get_headers()
-    params = {}
-    if well_ids:
-      params['well_ids'] = well_ids
-    if refresh:
-      params['refresh'] = refresh
-    result = self.session.get('{}/v1/wells/production/today-prediction'.format(self.url), headers=headers, params=params)
-    if result.status_code == 200:
-      response = result.json()
-      logger.debug('Today predicted: {}'.format(response))
-      return response
-    else:
-      raise Client_Exception('Unable to retrieve today predicted')    
+    params = _params(well_ids=well_ids, refresh=refresh)
+    response = self._get_json(self._v1 + '/wells/production/today-prediction', 'Unable to retrieve today predicted', params=params)
+    logger.debug('Today predicted: %s', response)
+    return response
+
+
+from .async_client import AsyncClient  # noqa: E402,F401
@@ -0,0 +1,183 @@
+import asyncio
+import time
+
+try:
+  import httpx
+except ImportError:
+  httpx = None
+
+from . import _HTTPX_OPTIONS, Client_Exception, _datapoints_body, _filter_assets, _json, _json_body, _bulk_results, _params, _token_expiry, logger
+
+
+async def _gather(func, asset_ids):
+  results = await asyncio.gather(*[func(asset_id) for asset_id in asset_ids], return_exceptions=True)
+  for result in results:
+    # Cancellation and other non-Exception errors are not per-asset failures
+    if isinstance(result, BaseException) and not isinstance(result, Exception):
+      raise result
+  return [(asset_id, None, result) if isinstance(result, Exception) else (asset_id, result, None) for asset_id, result in zip(asset_ids, results)]
+
+
+class AsyncClient():
+  def __init__(self, url, client_id, client_secret, customer_id = None, max_connections = 100, max_keepalive_connections = 50):
+    if httpx is None:
+      raise Client_Exception('httpx is required for AsyncClient: pip install sotaog_public_api_client[async]')
+    self.url = url.rstrip('/')
+    self._v1 = self.url + '/v1'
+    self.customer_id = customer_id
+    self.token = None
+    self._token_expires = None
+    # Created lazily so the lock binds to the running event loop
+    self._auth_lock = None
+    self._client_id = client_id
+    self._client_secret = client_secret
+    # One shared client so every request reuses the same pool (and h2 connection)
+    self._client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+        **_HTTPX_OPTIONS)
+
+  async def __aenter__(self):
+    await self.authenticate()
+    return self
+
+  async def __aexit__(self, *exc_info):
+    await self.aclose()
+
+  async def aclose(self):
+    await self._client.aclose()
+
+  async def authenticate(self):
+    logger.info('Initializing async Sotaog API client for %s', self.url)
+    data = {
+        'grant_type': 'client_credentials'
+    }
+    result = await self._client.post(self._v1 + '/authenticate', data=data, auth=(self._client_id, self._client_secret))
+    if result.status_code == 200:
+      auth = _json(result)
+      self.token = auth['access_token']
+      self._token_expires = _token_expiry(auth)
+      self._client.headers.update(self._get_headers())
+    else:
+      raise Client_Exception('Unable to authenticate to API', response=result)
+
+  def _token_expired(self):
+    return self._token_expires is not None and time.time() > self._token_expires - 30
+
+  async def _refresh_token(self, stale_token):
+    if self._auth_lock is None:
+      self._auth_lock = asyncio.Lock()
+    async with self._auth_lock:
+      # Another task may have refreshed while we waited for the lock
+      if self.token == stale_token:
+        await self.authenticate()
+
+  async def _request(self, method, url, **kwargs):
+    if isinstance(kwargs.get('data'), bytes):
+      kwargs['content'] = kwargs.pop('data')
+    if self._token_expired():
+      await self._refresh_token(self.token)
+    token = self.token
+    result = await self._client.request(method, url, **kwargs)
+    if result.status_code == 401:
+      # The token was rejected before its expiry, authenticate again and retry once
+      await result.aclose()
+      await self._refresh_token(token)
+      result = await self._client.request(method, url, **kwargs)
+    return result
+
+  async def _get_json(self, url, error, params = None):
+    result = await self._request('GET', url, params=params)
+    if result.status_code != 200:
+      raise Client_Exception(error, response=result)
+    return _json(result)
+
+  def _get_headers(self):
+    headers = {
+        'authorization': 'Bearer {}'.format(self.token)
+    }
+    if self.customer_id:
+      headers['x-sotaog-customer-id'] = self.customer_id
+    return headers
+
+  async def get_alarm_services(self):
+    logger.debug('Getting alarm services')
+    return await self._get_json(self._v1 + '/alarm-services', 'Unable to retrieve alarm services')
+
+  async def get_alarm_service(self, alarm_service_id):
+    logger.debug('Getting alarm service %s', alarm_service_id)
+    return await self._get_json('{}/alarm-services/{}'.format(self._v1, alarm_service_id), 'Unable to retrieve alarm service {}'.format(alarm_service_id))
+
+  async def get_alarms(self):
+    logger.debug('Getting alarms')
+    return await self._get_json(self._v1 + '/alarms', 'Unable to retrieve alarms')
+
+  async def get_facilities(self):
+    logger.debug('Getting facilities')
+    return await self._get_json(self._v1 + '/facilities', 'Unable to retrieve facilities')
+
+  async def get_facility(self, facility_id):
+    logger.debug('Getting facility: %s', facility_id)
+    return await self._get_json('{}/facilities/{}'.format(self._v1, facility_id), 'Unable to retrieve facility {}'.format(facility_id))
+
+  async def get_asset(self, asset_id, type = 'assets'):
+    logger.debug('Getting asset %s of type: %s', asset_id, type)
+    return await self._get_json('{}/{}/{}'.format(self._v1, type, asset_id), 'Unable to retrieve asset {} of type {}'.format(asset_id, type))
+
+  async def get_assets(self, type = 'assets', facility = None, asset_type = None):
+    logger.debug('Getting assets of type: %s', type)
+    params = _params(facility=facility, asset_type=asset_type)
+    result = await self._request('GET', '{}/{}'.format(self._v1, type), params=params)
+    if result.status_code == 400 and params:
+      result = await self._request('GET', '{}/{}'.format(self._v1, type))
+    if result.status_code == 200:
+      if facility or asset_type:
+        return _filter_assets(result, facility, asset_type)
+      return _json(result)
+    else:
+      raise Client_Exception('Unable to retrieve assets of type {}'.format(asset_type), response=result)
+
+  async def get_datatypes(self, group_by='asset'):
+    logger.debug('Getting datatypes')
+    params = {'group_by': group_by} if group_by else None
+    return await self._get_json(self._v1 + '/datatypes', 'Unable to get datatypes', params=params)
+
+  async def get_datatype(self, datatype_id):
+    logger.debug('Getting datatype %s', datatype_id)
+    params = {'group_by': 'asset'}
+    return await self._get_json('{}/datatypes/{}'.format(self._v1, datatype_id), 'Unable to get datatype {}'.format(datatype_id), params=params)
+
+  async def get_datapoints(self, asset_datatypes, start_ts = None, end_ts = None, sort = 'desc', limit = 100):
+    logger.debug('Getting datapoints for asset_datatypes: %s', asset_datatypes)
+    body = _datapoints_body(asset_datatypes, start_ts, end_ts, sort, limit)
+    result = await self._request('POST', self._v1 + '/datapoints', **_json_body(body))
+    if result.status_code == 200:
+      return _json(result)
+    else:
+      raise Client_Exception('Unable to get datapoints', response=result)
+
+  async def get_asset_datapoints(self, asset_id, datatypes = [], start_ts = None, end_ts = None, sort = 'desc', limit = 100):
+    logger.debug('Getting datapoints for asset: %s', asset_id)
+    params = _params(datatypes=datatypes, start_ts=start_ts, end_ts=end_ts, sort=sort, limit=limit)
+    return await self._get_json('{}/datapoints/{}'.format(self._v1, asset_id), 'Unable to get datapoints', params=params)
+
+  async def get_assets_bulk(self, asset_ids, type = 'assets'):
+    asset_ids = list(asset_ids)
+    logger.debug('Getting %s assets of type: %s', len(asset_ids), type)
+    assets = _bulk_results('get assets', await _gather(lambda asset_id: self.get_asset(asset_id, type), asset_ids))
+    return [assets[asset_id] for asset_id in asset_ids]
+
+  async def get_asset_datapoints_bulk(self, asset_ids, **kwargs):
+    asset_ids = list(asset_ids)
+    logger.debug('Getting datapoints for %s assets', len(asset_ids))
+    return _bulk_results('get datapoints', await _gather(lambda asset_id: self.get_asset_datapoints(asset_id, **kwargs), asset_ids))
+
+  async def post_datapoints(self, asset_id, datapoints):
+    logger.debug('Posting datapoints')
+    result = await self._request('POST', '{}/datapoints/{}'.format(self._v1, asset_id), **_json_body(datapoints))
+    if result.status_code != 202:
+      raise Client_Exception('Unable to post datapoints', response=result)
+
+  async def post_datapoints_bulk(self, datapoints_by_asset):
+    logger.debug('Posting datapoints for %s assets', len(datapoints_by_asset))
+    _bulk_results('post datapoints', await _gather(lambda asset_id: self.post_datapoints(asset_id, datapoints_by_asset[asset_id]), list(datapoints_by_asset)))
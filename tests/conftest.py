@@ -0,0 +1,126 @@
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+import sotaog_public_api_client
+
+
+class ApiServer(object):
+    """Local HTTP server answering from per-route handlers.
+
+    A handler takes the recorded request dict and returns (status, body) or
+    (status, body, headers); body is bytes, None or anything JSON serializable.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.routes = {
+            ('POST', '/v1/authenticate'): lambda request: (200, {'access_token': 'token', 'expires_in': 3600}),
+        }
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get('content-length') or 0)
+                request = {
+                    'method': self.command,
+                    'path': url.path,
+                    'query': parse_qs(url.query),
+                    'headers': {key.lower(): value for key, value in self.headers.items()},
+                    'body': self.rfile.read(length),
+                }
+                server.requests.append(request)
+                handler = server.routes.get((self.command, url.path))
+                response = handler(request) if handler else (404, {'message': 'not found'})
+                status, body = response[0], response[1]
+                headers = response[2] if len(response) > 2 else {}
+                if body is not None and not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                body = body or b''
+                self.send_response(status)
+                self.send_header('content-type', 'application/json')
+                self.send_header('content-length', str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = _handle
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{}'.format(self._httpd.server_address[1])
+        threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def calls(self, path):
+        return [request for request in self.requests if request['path'] == path]
+
+    def shutdown(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class StubSession(object):
+    """Stands in for requests.Session, answering from per-route handlers like ApiServer."""
+
+    def __init__(self):
+        self.headers = {}
+        self.requests = []
+        self.routes = {
+            ('POST', '/v1/authenticate'): lambda request: (200, {'access_token': 'token', 'expires_in': 3600}),
+        }
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        pass
+
+    def request(self, method, url, stream=False, **kwargs):
+        path = urlparse(url).path
+        request = dict(kwargs, method=method, path=path, session_headers=dict(self.headers))
+        self.requests.append(request)
+        handler = self.routes.get((method, path))
+        result = handler(request) if handler else (404, {'message': 'not found'})
+        response = requests.Response()
+        response.status_code = result[0]
+        response.headers.update(result[2] if len(result) > 2 else {})
+        body = result[1]
+        response._content = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+        response.raw = io.BytesIO(response._content or b'')
+        response.url = url
+        return response
+
+    def calls(self, path):
+        return [request for request in self.requests if request['path'] == path]
+
+
+@pytest.fixture
+def stub_session(monkeypatch):
+    session = StubSession()
+    monkeypatch.setattr(sotaog_public_api_client.requests, 'Session', lambda: session)
+    return session
+
+
+@pytest.fixture
+def api_server():
+    server = ApiServer()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(params=['requests', 'httpx'])
+def transport(request):
+    if request.param == 'httpx':
+        pytest.importorskip('httpx')
+    return request.param
@@ -0,0 +1,50 @@
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('ijson')
+
+from sotaog_public_api_client import Client, Client_Exception  # noqa: E402
+
+
+@pytest.fixture
+def datapoints(api_server):
+    def serve(body):
+        api_server.routes[('POST', '/v1/datapoints')] = lambda request: (200, body)
+        return Client(api_server.url, 'id', 'secret')
+    return serve
+
+
+class TestDatapointsAsArrays:
+    def test_columns(self, datapoints):
+        client = datapoints([{'ts': 1, 'value': 1.5}, {'ts': 2, 'value': 2.5}])
+        arrays = client.get_datapoints_as_arrays(['a'])
+        assert arrays['ts'].dtype == numpy.int64
+        assert arrays['ts'].tolist() == [1, 2]
+        assert arrays['value'].dtype == numpy.float64
+        assert arrays['value'].tolist() == [1.5, 2.5]
+
+    def test_empty(self, datapoints):
+        arrays = datapoints([]).get_datapoints_as_arrays(['a'])
+        assert len(arrays['ts']) == 0
+        assert len(arrays['value']) == 0
+
+    def test_missing_float_is_nan(self, datapoints):
+        client = datapoints([{'ts': 1}, {'ts': 2, 'value': None}])
+        assert numpy.isnan(client.get_datapoints_as_arrays(['a'])['value']).all()
+
+    def test_custom_columns(self, datapoints):
+        client = datapoints([{'ts': 1, 'value': 1.5}])
+        arrays = client.get_datapoints_as_arrays(['a'], columns={'value': 'float32'})
+        assert list(arrays) == ['value']
+        assert arrays['value'].dtype == numpy.float32
+
+    @pytest.mark.parametrize('dtype', ['bool', 'float16', 'datetime64[s]', 'object', 'not-a-dtype'])
+    def test_unsupported_dtype(self, datapoints, dtype):
+        with pytest.raises(Client_Exception):
+            datapoints([]).get_datapoints_as_arrays(['a'], columns={'ts': dtype})
+
+    @pytest.mark.parametrize('value', [None, 'high', 1.5])
+    def test_bad_integer_value(self, datapoints, value):
+        client = datapoints([{'ts': 1}, {'ts': value}])
+        with pytest.raises(Client_Exception, match='Datapoint 1'):
+            client.get_datapoints_as_arrays(['a'], columns={'ts': 'int64'})
@@ -0,0 +1,205 @@
+import asyncio
+import datetime
+import json
+import time
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+
+from sotaog_public_api_client import AsyncClient, Bulk_Exception  # noqa: E402
+
+
+def make_client(handler):
+    client = AsyncClient('http://api.test', 'id', 'secret')
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def auth_response(token='token'):
+    return httpx.Response(200, json={'access_token': token, 'expires_in': 3600})
+
+
+class TestAsyncClient:
+    def test_matches_requests_defaults(self, api_server):
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (302, None, {'location': '/v1/datapoints/b'})
+        api_server.routes[('GET', '/v1/datapoints/b')] = lambda request: (200, [{'ts': 1}])
+
+        async def run():
+            async with AsyncClient(api_server.url, 'id', 'secret') as client:
+                assert client._client.timeout == httpx.Timeout(None)
+                return await client.get_asset_datapoints('a')
+
+        assert asyncio.run(run()) == [{'ts': 1}]
+
+    def test_authenticate_sets_headers(self):
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                assert request.headers['authorization'].startswith('Basic ')
+                return auth_response()
+            return httpx.Response(200, json={'authorization': request.headers['authorization']})
+
+        async def run():
+            async with make_client(handler) as client:
+                return await client.get_facilities()
+
+        assert asyncio.run(run()) == {'authorization': 'Bearer token'}
+
+    def test_get_assets_bulk(self):
+        requested = []
+
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response()
+            requested.append(request.url.path)
+            return httpx.Response(200, json={'id': request.url.path.rsplit('/', 1)[1]})
+
+        async def run():
+            async with make_client(handler) as client:
+                return await client.get_assets_bulk(['a', 'b', 'c'], type='wells')
+
+        assert asyncio.run(run()) == [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+        assert sorted(requested) == ['/v1/wells/a', '/v1/wells/b', '/v1/wells/c']
+
+    def test_get_asset_datapoints_bulk_partial_failure(self):
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response()
+            if request.url.path == '/v1/datapoints/b':
+                return httpx.Response(500, json={'message': 'boom'})
+            return httpx.Response(200, json=[{'path': request.url.path}])
+
+        async def run():
+            async with make_client(handler) as client:
+                return await client.get_asset_datapoints_bulk(asset_id for asset_id in ('a', 'b', 'c'))
+
+        with pytest.raises(Bulk_Exception) as error:
+            asyncio.run(run())
+        assert error.value.results == {'a': [{'path': '/v1/datapoints/a'}], 'c': [{'path': '/v1/datapoints/c'}]}
+        assert list(error.value.errors) == ['b']
+
+    def test_post_datapoints_bulk(self):
+        posted = {}
+
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response()
+            posted[request.url.path] = json.loads(request.content)
+            return httpx.Response(202)
+
+        async def run():
+            async with make_client(handler) as client:
+                await client.post_datapoints_bulk({'a': [{'ts': 1}], 'b': [{'ts': 2}]})
+
+        asyncio.run(run())
+        assert posted == {'/v1/datapoints/a': [{'ts': 1}], '/v1/datapoints/b': [{'ts': 2}]}
+
+    def test_post_datapoints_bulk_partial_failure(self):
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response()
+            if request.url.path == '/v1/datapoints/b':
+                return httpx.Response(500, json={'message': 'boom'})
+            return httpx.Response(202)
+
+        async def run():
+            async with make_client(handler) as client:
+                await client.post_datapoints_bulk({'a': [1], 'b': [2], 'c': [3]})
+
+        with pytest.raises(Bulk_Exception) as error:
+            asyncio.run(run())
+        assert error.value.succeeded == ['a', 'c']
+        assert list(error.value.errors) == ['b']
+        assert error.value.errors['b'].body == {'message': 'boom'}
+
+    def test_datapoint_bodies_use_json_body(self):
+        sent = []
+
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response()
+            sent.append((request.url.path, request.headers['content-type'], request.content))
+            return httpx.Response(202 if request.url.path != '/v1/datapoints' else 200, json=[])
+
+        async def run():
+            async with make_client(handler) as client:
+                await client.post_datapoints('a', [{'ts': datetime.datetime(2020, 1, 2), 'value': float('nan')}])
+                await client.get_datapoints(['a'], limit=5)
+
+        asyncio.run(run())
+        assert sent == [
+            ('/v1/datapoints/a', 'application/json', b'[{"ts":"2020-01-02T00:00:00","value":null}]'),
+            ('/v1/datapoints', 'application/json', b'{"sort":"desc","limit":5,"asset_datatypes":["a"]}'),
+        ]
+
+
+class TestAsyncTokenRefresh:
+    def test_proactive_refresh(self):
+        tokens = iter(['first', 'second'])
+        seen = []
+
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response(next(tokens))
+            seen.append(request.headers['authorization'])
+            return httpx.Response(200, json=[])
+
+        async def run():
+            async with make_client(handler) as client:
+                client._token_expires = time.time() + 10
+                await client.get_alarms()
+
+        asyncio.run(run())
+        assert seen == ['Bearer second']
+
+    def test_401_retried_once(self):
+        tokens = iter(['first', 'second'])
+        calls = []
+
+        def handler(request):
+            if request.url.path == '/v1/authenticate':
+                return auth_response(next(tokens))
+            calls.append(request.headers['authorization'])
+            return httpx.Response(200 if request.headers['authorization'] == 'Bearer second' else 401, json=[])
+
+        async def run():
+            async with make_client(handler) as client:
+                return await client.get_alarms()
+
+        assert asyncio.run(run()) == []
+        assert calls == ['Bearer first', 'Bearer second']
+
+    def test_concurrent_expiry_authenticates_once(self):
+        authentications = []
+
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            if request.url.path == '/v1/authenticate':
+                authentications.append(request)
+                return auth_response('token{}'.format(len(authentications)))
+            return httpx.Response(200, json=[])
+
+        async def run():
+            async with make_client(handler) as client:
+                client._token_expires = time.time()
+                await asyncio.gather(*[client.get_alarms() for _ in range(20)])
+
+        asyncio.run(run())
+        assert len(authentications) == 2
+
+    def test_concurrent_401_authenticates_once(self):
+        authentications = []
+
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            if request.url.path == '/v1/authenticate':
+                authentications.append(request)
+                return auth_response('token{}'.format(len(authentications)))
+            return httpx.Response(200 if request.headers['authorization'] == 'Bearer token2' else 401, json=[])
+
+        async def run():
+            async with make_client(handler) as client:
+                await asyncio.gather(*[client.get_alarms() for _ in range(5)])
+
+        asyncio.run(run())
+        assert len(authentications) == 2
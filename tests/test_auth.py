@@ -0,0 +1,57 @@
+import base64
+import json
+import time
+
+import pytest
+
+from sotaog_public_api_client import Client, Client_Exception, _token_expiry
+
+
+def jwt(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip('=')
+    return 'header.{}.signature'.format(payload)
+
+
+class TestTokenExpiry:
+    def test_expires_in(self):
+        before = time.time()
+        assert before + 60 <= _token_expiry({'access_token': 'token', 'expires_in': 60}) <= time.time() + 60
+
+    def test_expires_in_preferred_over_jwt_exp(self):
+        expiry = _token_expiry({'access_token': jwt({'exp': 1}), 'expires_in': 60})
+        assert expiry > time.time()
+
+    def test_jwt_exp(self):
+        assert _token_expiry({'access_token': jwt({'exp': 1893456000})}) == 1893456000
+
+    def test_unknown_expiry(self):
+        assert _token_expiry({'access_token': 'opaque'}) is None
+        assert _token_expiry({'access_token': jwt({'sub': 'client'})}) is None
+
+
+class TestTokenRefresh:
+    def test_proactive_refresh(self, stub_session):
+        stub_session.routes[('GET', '/v1/alarms')] = lambda request: (200, [])
+        client = Client('http://api.test', 'id', 'secret')
+        client._token_expires = time.time() + 10
+        client.get_alarms()
+        assert len(stub_session.calls('/v1/authenticate')) == 2
+        assert client._token_expires > time.time() + 3000
+
+    def test_401_retried_once(self, stub_session):
+        tokens = iter(['first', 'second'])
+        stub_session.routes[('POST', '/v1/authenticate')] = lambda request: (200, {'access_token': next(tokens), 'expires_in': 3600})
+        stub_session.routes[('GET', '/v1/alarms')] = lambda request: (
+            (200, []) if request['session_headers']['authorization'] == 'Bearer second' else (401, None))
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_alarms() == []
+        assert len(stub_session.calls('/v1/authenticate')) == 2
+        assert len(stub_session.calls('/v1/alarms')) == 2
+
+    def test_persistent_401_not_retried_again(self, stub_session):
+        stub_session.routes[('GET', '/v1/alarms')] = lambda request: (401, None)
+        client = Client('http://api.test', 'id', 'secret')
+        with pytest.raises(Client_Exception):
+            client.get_alarms()
+        assert len(stub_session.calls('/v1/alarms')) == 2
+        assert len(stub_session.calls('/v1/authenticate')) == 2
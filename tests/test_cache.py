@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+import sotaog_public_api_client
+from sotaog_public_api_client import Client
+
+
+def asset_route(etag=None):
+    def handler(request):
+        asset_id = request['path'].rsplit('/', 1)[1]
+        if etag and request.get('headers', {}).get('if-none-match') == etag:
+            return (304, None)
+        return (200, {'id': asset_id}, {'etag': etag} if etag else {})
+    return handler
+
+
+class TestCache:
+    def test_hit_within_ttl(self, stub_session):
+        stub_session.routes[('GET', '/v1/assets/5')] = asset_route()
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_asset(5) == {'id': '5'}
+        assert client.get_asset(5) == {'id': '5'}
+        assert len(stub_session.calls('/v1/assets/5')) == 1
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_returned_value_is_not_shared(self, stub_session, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(sotaog_public_api_client, 'orjson', None)
+        stub_session.routes[('GET', '/v1/assets/5')] = asset_route()
+        client = Client('http://api.test', 'id', 'secret')
+        asset = client.get_asset(5)
+        asset['name'] = 'changed'
+        assert client.get_asset(5) == {'id': '5'}
+
+    def test_304_revalidation_reuses_value(self, stub_session):
+        stub_session.routes[('GET', '/v1/assets/5')] = asset_route(etag='"v1"')
+        client = Client('http://api.test', 'id', 'secret', cache_ttl=0.01)
+        assert client.get_asset(5) == {'id': '5'}
+        time.sleep(0.02)
+        assert client.get_asset(5) == {'id': '5'}
+        calls = stub_session.calls('/v1/assets/5')
+        assert len(calls) == 2
+        assert calls[1]['headers'] == {'if-none-match': '"v1"'}
+
+    def test_lru_eviction(self, stub_session):
+        for asset_id in ('1', '2', '3'):
+            stub_session.routes[('GET', '/v1/assets/' + asset_id)] = asset_route()
+        client = Client('http://api.test', 'id', 'secret', cache_size=2)
+        client.get_asset(1)
+        client.get_asset(2)
+        client.get_asset(1)
+        client.get_asset(3)
+        client.get_asset(1)
+        client.get_asset(2)
+        assert len(stub_session.calls('/v1/assets/1')) == 1
+        assert len(stub_session.calls('/v1/assets/2')) == 2
+        assert len(client._cache) == 2
+
+    def test_invalidate(self, stub_session):
+        stub_session.routes[('GET', '/v1/facilities/f')] = lambda request: (200, {'id': 'f'})
+        client = Client('http://api.test', 'id', 'secret')
+        client.get_facility('f')
+        client.invalidate()
+        client.get_facility('f')
+        assert len(stub_session.calls('/v1/facilities/f')) == 2
+
+    def test_disabled_with_zero_ttl(self, stub_session):
+        stub_session.routes[('GET', '/v1/datatypes/d')] = lambda request: (200, {'id': 'd'})
+        client = Client('http://api.test', 'id', 'secret', cache_ttl=0)
+        assert client.get_datatype('d') == {'id': 'd'}
+        assert client.get_datatype('d') == {'id': 'd'}
+        assert len(stub_session.calls('/v1/datatypes/d')) == 2
+        assert not client._cache
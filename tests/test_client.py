@@ -1,3 +1,180 @@
+import dataclasses
+import datetime
+import enum
+import threading
+import uuid
+
+import pytest
+
+import sotaog_public_api_client
+from sotaog_public_api_client import Bulk_Exception, Client, Client_Exception, _datapoints_body, _dumps
+
+BODY = {'ts': datetime.datetime(2020, 1, 2, 3, 4, 5, 123), 'day': datetime.date(2020, 1, 2), 'nan': float('nan'), 'name': '\u00e9', 1: [1.5, 2]}
+WIRE = b'{"ts":"2020-01-02T03:04:05.000123","day":"2020-01-02","nan":null,"name":"\xc3\xa9","1":[1.5,2]}'
+
+
+@dataclasses.dataclass
+class Point:
+    ts: int
+    value: float
+
+
+class Quality(enum.Enum):
+    GOOD = 'good'
+
+
+NETWORKS = [{'id': 1, 'facilities': ['f1']}, {'id': 2, 'facilities': ['f2']}]
+ASSETS = [
+    {'id': 'a1', 'facility': 'f1', 'asset_type': 'tank'},
+    {'id': 'a2', 'facility': 'f1', 'asset_type': 'well'},
+    {'id': 'a3', 'facility': 'f2', 'asset_type': 'tank'},
+]
+
+
 class TestClient:
     def test_smoke(self):
-        assert True
\ No newline at end of file
+        assert True
+
+
+class TestServerSideFilters:
+    def test_swd_networks_sends_facility_param(self, stub_session):
+        stub_session.routes[('GET', '/v1/swd-networks')] = lambda request: (200, NETWORKS[:1])
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_swd_networks('f1') == NETWORKS[:1]
+        assert [call.get('params') for call in stub_session.calls('/v1/swd-networks')] == [{'facility': 'f1'}]
+
+    def test_swd_networks_falls_back_on_400(self, stub_session):
+        def networks(request):
+            if request.get('params'):
+                return (400, {'message': 'unsupported'})
+            return (200, NETWORKS)
+        stub_session.routes[('GET', '/v1/swd-networks')] = networks
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_swd_networks('f1') == NETWORKS[:1]
+        assert [call.get('params') for call in stub_session.calls('/v1/swd-networks')] == [{'facility': 'f1'}, None]
+
+    def test_swd_networks_refilters_ignored_param(self, stub_session):
+        stub_session.routes[('GET', '/v1/swd-networks')] = lambda request: (200, NETWORKS)
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_swd_networks('f2') == NETWORKS[1:]
+
+    def test_assets_falls_back_on_400(self, stub_session):
+        def assets(request):
+            if request.get('params'):
+                return (400, {'message': 'unsupported'})
+            return (200, ASSETS)
+        stub_session.routes[('GET', '/v1/assets')] = assets
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_assets(facility='f1', asset_type='tank') == ASSETS[:1]
+        assert [call.get('params') for call in stub_session.calls('/v1/assets')] == [{'facility': 'f1', 'asset_type': 'tank'}, None]
+
+    @pytest.mark.parametrize('use_simdjson', [True, False])
+    def test_assets_refilters_ignored_params(self, stub_session, monkeypatch, use_simdjson):
+        if not use_simdjson:
+            monkeypatch.setattr(sotaog_public_api_client, 'simdjson', None)
+        elif sotaog_public_api_client.simdjson is None:
+            pytest.skip('pysimdjson is not installed')
+        stub_session.routes[('GET', '/v1/assets')] = lambda request: (200, ASSETS)
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.get_assets(facility='f1') == ASSETS[:2]
+        assert client.get_assets(asset_type='tank') == [ASSETS[0], ASSETS[2]]
+        assert client.get_assets(facility='f2', asset_type='well') == []
+
+
+class TestPostDatapointsBulk:
+    def test_posts_every_asset(self, stub_session):
+        for asset_id in ('a', 'b'):
+            stub_session.routes[('POST', '/v1/datapoints/' + asset_id)] = lambda request: (202, None)
+        client = Client('http://api.test', 'id', 'secret')
+        assert client.post_datapoints_bulk({'a': [{'ts': 1}], 'b': [{'ts': 2}]}) is None
+        assert len(stub_session.calls('/v1/datapoints/a')) == len(stub_session.calls('/v1/datapoints/b')) == 1
+
+    def test_partial_failure_reports_each_asset(self, stub_session):
+        stub_session.routes[('POST', '/v1/datapoints/a')] = lambda request: (202, None)
+        stub_session.routes[('POST', '/v1/datapoints/b')] = lambda request: (500, {'message': 'boom'})
+        stub_session.routes[('POST', '/v1/datapoints/c')] = lambda request: (202, None)
+        client = Client('http://api.test', 'id', 'secret')
+        with pytest.raises(Bulk_Exception) as error:
+            client.post_datapoints_bulk({'a': [1], 'b': [2], 'c': [3]})
+        assert sorted(error.value.succeeded) == ['a', 'c']
+        assert list(error.value.errors) == ['b']
+        assert isinstance(error.value.errors['b'], Client_Exception)
+        assert error.value.errors['b'].body == {'message': 'boom'}
+
+
+class TestGetAssetDatapointsBulk:
+    def test_fetches_concurrently(self, stub_session):
+        # Each handler waits for the others, so this only completes if all three requests are in flight together
+        barrier = threading.Barrier(3, timeout=5)
+
+        def datapoints(request):
+            barrier.wait()
+            return (200, [{'asset': request['path'].rsplit('/', 1)[1]}])
+        for asset_id in ('a', 'b', 'c'):
+            stub_session.routes[('GET', '/v1/datapoints/' + asset_id)] = datapoints
+        client = Client('http://api.test', 'id', 'secret')
+        result = client.get_asset_datapoints_bulk(asset_id for asset_id in ('a', 'b', 'c'))
+        assert result == {'a': [{'asset': 'a'}], 'b': [{'asset': 'b'}], 'c': [{'asset': 'c'}]}
+
+    def test_partial_failure_keeps_other_results(self, stub_session):
+        stub_session.routes[('GET', '/v1/datapoints/a')] = lambda request: (200, [{'ts': 1}])
+        stub_session.routes[('GET', '/v1/datapoints/b')] = lambda request: (500, {'message': 'boom'})
+        client = Client('http://api.test', 'id', 'secret')
+        with pytest.raises(Bulk_Exception) as error:
+            client.get_asset_datapoints_bulk(['a', 'b'], limit=5)
+        assert error.value.results == {'a': [{'ts': 1}]}
+        assert error.value.succeeded == ['a']
+        assert isinstance(error.value.errors['b'], Client_Exception)
+        assert stub_session.calls('/v1/datapoints/a')[0]['params']['limit'] == 5
+
+
+class TestJsonBody:
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_post_datapoints_wire_format(self, stub_session, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(sotaog_public_api_client, 'orjson', None)
+        stub_session.routes[('POST', '/v1/datapoints/a')] = lambda request: (202, None)
+        client = Client('http://api.test', 'id', 'secret')
+        client.post_datapoints('a', BODY)
+        call = stub_session.calls('/v1/datapoints/a')[0]
+        assert call['data'] == WIRE
+        assert call['headers'] == {'content-type': 'application/json'}
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_get_datapoints_wire_format(self, stub_session, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(sotaog_public_api_client, 'orjson', None)
+        stub_session.routes[('POST', '/v1/datapoints')] = lambda request: (200, [])
+        client = Client('http://api.test', 'id', 'secret')
+        client.get_datapoints(['a'], start_ts=datetime.date(2020, 1, 2))
+        call = stub_session.calls('/v1/datapoints')[0]
+        assert call['data'] == b'{"sort":"desc","limit":100,"asset_datatypes":["a"],"start_ts":"2020-01-02"}'
+        assert call['headers'] == {'content-type': 'application/json'}
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_dataclass_uuid_and_enum(self, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(sotaog_public_api_client, 'orjson', None)
+        elif sotaog_public_api_client.orjson is None:
+            pytest.skip('orjson is not installed')
+        body = [Point(1, float('nan')), uuid.UUID(int=1), Quality.GOOD]
+        assert _dumps(body) == b'[{"ts":1,"value":null},"00000000-0000-0000-0000-000000000001","good"]'
+
+    @pytest.mark.parametrize('body', [[1.5], [float('nan')]])
+    def test_circular_reference_raises_value_error(self, monkeypatch, body):
+        monkeypatch.setattr(sotaog_public_api_client, 'orjson', None)
+        body.append(body)
+        with pytest.raises(ValueError, match='Circular'):
+            _dumps(body)
+
+
+class TestDatapointsBody:
+    def test_defaults(self):
+        assert _datapoints_body(['a'], None, None, 'desc', 100) == {'sort': 'desc', 'limit': 100, 'asset_datatypes': ['a']}
+
+    def test_overrides_and_range(self):
+        assert _datapoints_body(['a'], 1, 2, 'asc', None) == {'sort': 'asc', 'asset_datatypes': ['a'], 'start_ts': 1, 'end_ts': 2}
+
+    def test_defaults_not_mutated(self):
+        _datapoints_body(['a'], 1, 2, 'desc', 100)['limit'] = 5
+        assert _datapoints_body(['b'], None, None, 'desc', 100) == {'sort': 'desc', 'limit': 100, 'asset_datatypes': ['b']}
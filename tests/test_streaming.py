@@ -0,0 +1,84 @@
+import gc
+import gzip
+
+import pytest
+
+pytest.importorskip('ijson')
+
+from sotaog_public_api_client import Client, Client_Exception  # noqa: E402
+
+DATAPOINTS = [{'ts': 1, 'value': 1.5}, {'ts': 2, 'value': 2.5}]
+
+
+def is_closed(response):
+    if hasattr(response, 'is_closed'):
+        return response.is_closed
+    return response.raw.closed
+
+
+class TestStreaming:
+    def test_iter_asset_datapoints_default_prefix(self, api_server, transport):
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (200, DATAPOINTS)
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        assert list(client.iter_asset_datapoints('a')) == DATAPOINTS
+
+    def test_iter_datapoints_custom_prefix(self, api_server, transport):
+        api_server.routes[('POST', '/v1/datapoints')] = lambda request: (200, {'datapoints': DATAPOINTS})
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        assert list(client.iter_datapoints(['a'], prefix='datapoints.item')) == DATAPOINTS
+
+    def test_gzip_encoded_response(self, api_server, transport):
+        body = gzip.compress(b'[{"ts": 1, "value": 1.5}, {"ts": 2, "value": 2.5}]')
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (200, body, {'content-encoding': 'gzip'})
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        assert list(client.iter_asset_datapoints('a')) == DATAPOINTS
+
+    def test_brotli_encoded_response(self, api_server, transport):
+        brotli = pytest.importorskip('brotli')
+        body = brotli.compress(b'[{"ts": 1, "value": 1.5}, {"ts": 2, "value": 2.5}]')
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (200, body, {'content-encoding': 'br'})
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        assert list(client.iter_asset_datapoints('a')) == DATAPOINTS
+        assert 'br' in api_server.calls('/v1/datapoints/a')[0]['headers']['accept-encoding']
+
+    def test_response_closed_when_exhausted(self, api_server, transport):
+        api_server.routes[('GET', '/v1/alarms')] = lambda request: (200, [{'id': 1}])
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        stream = client.iter_alarms()
+        assert list(stream) == [{'id': 1}]
+        assert is_closed(stream._response)
+
+    def test_close_without_iterating(self, api_server, transport):
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (200, DATAPOINTS)
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        with client.iter_asset_datapoints('a') as stream:
+            response = stream._response
+        assert is_closed(response)
+
+    def test_unconsumed_stream_closed_on_gc(self, api_server, transport):
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (200, DATAPOINTS)
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        stream = client.iter_asset_datapoints('a')
+        response = stream._response
+        del stream
+        gc.collect()
+        assert is_closed(response)
+
+    def test_error_response_body_readable(self, api_server, transport):
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (500, {'message': 'boom'})
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        with pytest.raises(Client_Exception) as excinfo:
+            client.iter_asset_datapoints('a')
+        assert is_closed(excinfo.value.response)
+        assert excinfo.value.body == {'message': 'boom'}
+
+    def test_redirect_followed(self, api_server, transport):
+        api_server.routes[('GET', '/v1/datapoints/a')] = lambda request: (302, None, {'location': '/v1/datapoints/b'})
+        api_server.routes[('GET', '/v1/datapoints/b')] = lambda request: (200, DATAPOINTS)
+        client = Client(api_server.url, 'id', 'secret', transport=transport)
+        assert list(client.iter_asset_datapoints('a')) == DATAPOINTS
+
+    def test_httpx_has_no_client_timeout(self, api_server):
+        httpx = pytest.importorskip('httpx')
+        client = Client(api_server.url, 'id', 'secret', transport='httpx')
+        assert client.session.timeout == httpx.Timeout(None)